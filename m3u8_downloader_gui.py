@@ -3,6 +3,8 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import m3u8
 import os
 import json
@@ -11,6 +13,11 @@ import queue
 import subprocess
 import shutil
 import time
+import re
+import collections
+import functools
+import logging
+import sys
 from urllib.parse import urljoin, urlparse
 import concurrent.futures  # Ensure this is imported
 import traceback  # For printing full tracebacks
@@ -19,23 +26,167 @@ import traceback  # For printing full tracebacks
 DEFAULT_RESOLUTION = "720"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 FFMPEG_PATH = "ffmpeg"  # Assumes ffmpeg is in PATH. Change if necessary.
+# Concurrent segment fetches per stream. Segment downloads are I/O bound, so
+# this can sit well above the CPU count without hurting throughput.
+SEGMENT_WORKERS = 16
+# Connection pool size for the shared HTTP session (subtitles + manifests)
+HTTP_POOL_SIZE = 64
+# Subtitle and extra-audio workers per running download; the app's shared pool
+# is sized for MAX_CONCURRENT_DOWNLOADS of them
+AUX_WORKERS = 6
+# Upper bound of the "Concurrent DLs" setting; also sizes the download thread pool
+MAX_CONCURRENT_DOWNLOADS = 20
+# Let ffmpeg fetch simple HLS streams itself (one process, no Python per-segment work).
+# Only used for a single unencrypted rendition without separate audio; ffmpeg fetches
+# segments one at a time and doesn't retry, so this is off by default. Falls back to
+# the segment downloader if ffmpeg fails or skips a segment.
+FFMPEG_DIRECT_HLS = False
+# ffmpeg's HLS demuxer logs these (at warning level) when it skips a segment or gives
+# up on the playlist but still exits 0; any of them fails the direct download
+_FFMPEG_HLS_FAILURE_MARKERS = ("Failed to open segment", "Failed to reload playlist",
+                               "expired from playlists")
+# GUI queue polling interval (ms) while downloads run, and the slower sanity tick
+# used when nothing is active so an idle window doesn't keep waking Tk
+GUI_POLL_MS = 50
+GUI_IDLE_POLL_MS = 1000
+
+# Import filter for bare links: starts with http/ftp and mentions ".m3u8" (case-insensitive)
+_M3U8_LINK_RE = re.compile(r'(?:http|ftp).*\.m3u8', re.IGNORECASE | re.DOTALL)
+
+# Playlist file names that say nothing about the video; the parent folder name is used instead
+_GENERIC_NAMES = frozenset(
+    {'video', 'manifest', 'playlist', 'index', 'master', 'chunklist'})
+
+# Progress column text for 0..100, built once
+_PROGRESS_TEXT = tuple(f"{pct}%" for pct in range(101))
+
+# Queue/admission chatter; silent unless started with --verbose
+log = logging.getLogger("m3u8gui")
 
 # --- Helper Functions ---
 
 
+@functools.lru_cache(maxsize=1)
 def is_ffmpeg_installed():
-    """Checks if ffmpeg is accessible."""
+    """Checks if ffmpeg is accessible (looked up once per app run)."""
     return shutil.which(FFMPEG_PATH) is not None
 
 
+def create_http_session():
+    """Creates a requests session with a pooled, retrying adapter and our User-Agent."""
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504],
+                    allowed_methods=['GET', 'HEAD'])
+    adapter = HTTPAdapter(pool_connections=32,
+                          pool_maxsize=HTTP_POOL_SIZE, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _drop_page_cache(fd):
+    """Advises the kernel that the file's cached pages won't be needed (no-op where unsupported)."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def _fast_rmtree(path):
+    """
+    Removes a download's temp directory in a single scandir pass.
+
+    The layout is flat (segment files, plus one level of per-stream subdirectories);
+    anything else falls back to shutil.rmtree.
+    """
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    with os.scandir(entry.path) as sub_it:
+                        for sub_entry in sub_it:
+                            os.unlink(sub_entry.path)
+                    os.rmdir(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        shutil.rmtree(path)
+
+
+def _is_mpegts_file(path):
+    """True if the file starts with the MPEG-TS sync byte (0x47)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(1) == b'\x47'
+    except OSError:
+        return False
+
+
+def _concat_escape(text):
+    """Escapes text for a quoted path in an ffmpeg concat list."""
+    return text.replace('\\', '/').replace("'", "'\\''")
+
+
+def _ffmpeg_concat_list(segment_paths):
+    """
+    Builds an ffmpeg concat demuxer list (UTF-8 bytes) for the given files.
+
+    Entries are absolute 'file:' URLs: the list is usually read from pipe:0, and
+    ffmpeg resolves scheme-less entries against the list's URL (pipe:/...).
+    Segments share a directory, so each directory is escaped once; file names
+    (segment_NNNNN.ts) are only escaped if they contain a quote or backslash.
+    """
+    lines = []
+    prefixes = {}
+    for path in segment_paths:
+        split = path.rfind(os.sep) + 1
+        directory, name = path[:split], path[split:]  # directory keeps its trailing separator
+        prefix = prefixes.get(directory)
+        if prefix is None:
+            absolute_dir = os.path.join(os.path.abspath(directory), '')
+            prefix = prefixes[directory] = "file 'file:" + _concat_escape(absolute_dir)
+        if "'" in name or '\\' in name:
+            name = _concat_escape(name)
+        lines.append(f"{prefix}{name}'\n")
+    return ''.join(lines).encode('utf-8')
+
+
+def _playlist_text(response):
+    """
+    Returns a playlist body as text, decoded once.
+
+    HLS playlists are UTF-8 (RFC 8216), so when the server sends no charset the
+    body is decoded as UTF-8 instead of running requests' charset detection.
+    """
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    return response.text
+
+
+def _decode_text_response(response):
+    """Decodes a text body as UTF-8; charset detection only runs if that produces garbage."""
+    text = response.content.decode('utf-8-sig', 'replace')
+    if '\ufffd' in text[:1024]:
+        text = response.content.decode(
+            response.apparent_encoding or 'utf-8', 'replace')
+    return text
+
+
+# Characters that are invalid in filenames on most systems, mapped to replacements
+_SANITIZE_TABLE = str.maketrans({
+    '/': '-', '\\': '-', ':': '-', '*': '-', '?': '-',
+    '"': "'", '<': '-', '>': '-', '|': '-'})
+
+
 def sanitize_filename(name):
     """Removes or replaces characters invalid for filenames."""
-    name = str(name)  # Ensure it's a string
-    # Remove characters that are definitely invalid on most systems
-    name = name.replace('/', '-').replace('\\', '-').replace(':', '-').replace('*', '-').replace(
-        '?', '-').replace('"', "'").replace('<', '-').replace('>', '-').replace('|', '-')
+    # Replace characters that are definitely invalid on most systems (single pass)
+    name = str(name).translate(_SANITIZE_TABLE)
     # Remove leading/trailing whitespace and control characters
-    name = "".join(c for c in name if c.isprintable())
+    name = "".join(filter(str.isprintable, name))
     name = name.strip()
     # Replace multiple spaces with single space
     name = ' '.join(name.split())
@@ -46,6 +197,124 @@ def sanitize_filename(name):
     return name if name else "downloaded_video"
 
 
+def _names_from_url_path(url):
+    """
+    Returns (file stem, parent directory name) of a URL's path, '' where missing.
+
+    Same result as splitext/basename/dirname over urlparse(url).path. Plain
+    http(s) URLs (the usual import) are handled with string searches; anything
+    else goes through urlparse.
+    """
+    if not url.startswith(('http://', 'https://')) or any(c in url for c in '\t\r\n'):
+        path = urlparse(url).path
+        return (os.path.splitext(os.path.basename(path))[0],
+                os.path.basename(os.path.dirname(path)))
+    end = len(url)
+    for sep in ('?', '#'):
+        pos = url.find(sep, 0, end)
+        if pos != -1:
+            end = pos
+    path_start = url.find('/', url.index('://') + 3, end)
+    if path_start == -1:
+        return "", ""
+    slash = url.rfind('/', path_start, end)
+    params = url.find(';', slash, end)  # urlparse splits ;params off the last segment
+    if params != -1:
+        end = params
+    stem = url[slash + 1:end]
+    dot = stem.rfind('.')
+    if dot > len(stem) - len(stem.lstrip('.')):  # Like splitext, leading dots are not an extension
+        stem = stem[:dot]
+    parent_end = slash
+    while parent_end > path_start and url[parent_end - 1] == '/':
+        parent_end -= 1  # dirname() drops repeated separators
+    parent_slash = url.rfind('/', path_start, parent_end)
+    parent = url[parent_slash + 1:parent_end] if parent_slash != -1 else ""
+    return stem, parent
+
+
+def make_uri_resolver(base_uri):
+    """
+    Returns a function resolving playlist-relative URIs against base_uri.
+
+    Plain relative names ("seg_001.ts", "sub/seg.ts") and absolute http(s) URLs are
+    handled with string operations; anything else (root-relative, dot or empty
+    segments, queries) uses urljoin, as does a base that isn't a lowercase http(s) URL
+    with a plain directory path (no query/fragment, dot or empty segments).
+    """
+    base_prefix = None
+    if base_uri and base_uri.startswith(('http://', 'https://')) and '?' not in base_uri and '#' not in base_uri:
+        path_start = base_uri.find('/', base_uri.index('://') + 3)
+        if path_start != -1:  # The prefix is only the base's directory if it has a path
+            base_prefix = base_uri.rsplit('/', 1)[0] + '/'
+            # urljoin normalizes dot segments and collapses empty ones in the base path
+            base_dir = base_prefix[path_start:]
+            if '//' in base_dir or '/./' in base_dir or '/../' in base_dir:
+                base_prefix = None
+
+    def resolve(uri):
+        if uri.startswith(('http://', 'https://')):
+            return uri
+        if (base_prefix and not uri.startswith(('/', '.', '?', '#')) and ':' not in uri
+                and '/.' not in uri and '//' not in uri):
+            return base_prefix + uri
+        return urljoin(base_uri, uri)
+    return resolve
+
+
+# Minimal stand-ins for m3u8's M3U8/Segment, with just the fields the downloader reads
+_MediaPlaylist = collections.namedtuple('_MediaPlaylist', ['segments', 'base_uri'])
+_MediaSegment = collections.namedtuple(
+    '_MediaSegment', ['uri', 'absolute_uri', 'duration'])
+
+# Tags whose attributes the line scanner would lose; such playlists go through m3u8
+_FULL_PARSE_TAGS = ('#EXT-X-KEY', '#EXT-X-MAP',
+                    '#EXT-X-BYTERANGE', '#EXT-X-STREAM-INF')
+
+
+def parse_media_playlist(text, uri):
+    """
+    Parses a media playlist, using a single line scan for plain playlists.
+
+    Encrypted, fMP4 (EXT-X-MAP), byte-range and master playlists fall back to m3u8.loads.
+    """
+    if any(tag in text for tag in _FULL_PARSE_TAGS):
+        return m3u8.loads(text, uri=uri)
+    return _fast_parse_media_playlist(text, uri)
+
+
+def _fast_parse_media_playlist(text, base_uri):
+    """Scans a plain media playlist once, pairing each URI line with its #EXTINF duration."""
+    resolve_uri = make_uri_resolver(base_uri)
+    segments = []
+    expect_segment = False  # Like m3u8, only URI lines following #EXTINF are segments
+    duration = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            if line.startswith('#EXTINF:'):
+                expect_segment = True
+                try:
+                    duration = float(line[8:].split(',', 1)[0])
+                except ValueError:
+                    duration = None
+            continue
+        if expect_segment:
+            segments.append(_MediaSegment(line, resolve_uri(line), duration))
+            expect_segment = False
+    return _MediaPlaylist(segments, base_uri)
+
+
+def _is_plain_media_playlist(playlist):
+    """True if no segment is encrypted, byte-ranged or needs an init section (EXT-X-MAP)."""
+    if isinstance(playlist, _MediaPlaylist):
+        return True  # parse_media_playlist only scans playlists without those tags
+    return not any(segment.key or segment.init_section or segment.byterange
+                   for segment in playlist.segments)
+
+
 def get_video_and_audio_playlists(manifest, preferred_res=None):
     """
     Selects video playlist, identifies primary audio, and lists all associated audio.
@@ -57,7 +326,6 @@ def get_video_and_audio_playlists(manifest, preferred_res=None):
     )
     """
     target_playlist = None
-    best_bandwidth = -1
     all_audio_infos = []
     primary_audio_info = None
 
@@ -70,72 +338,63 @@ def get_video_and_audio_playlists(manifest, preferred_res=None):
             print("Error: No playlists found and no segments found.")
             return None, None, []
 
+    # One pass over the variants: (bandwidth, height, playlist)
+    candidates = []
+    for playlist in manifest.playlists:
+        stream_info = playlist.stream_info
+        bandwidth = stream_info.bandwidth
+        resolution = stream_info.resolution
+        height = resolution[1] if (resolution and len(resolution) > 1) else 0
+        candidates.append(
+            (bandwidth if bandwidth is not None else -1, height, playlist))
+
     # Select video based on preference or best bandwidth
-    preferred_found = False
     if preferred_res:
         try:
             height_to_find = int(preferred_res)
-            for playlist in manifest.playlists:
-                # Check if resolution attribute exists and is not None
-                if playlist.stream_info.resolution and len(playlist.stream_info.resolution) > 1:
-                    if playlist.stream_info.resolution[1] == height_to_find:
-                        target_playlist = playlist
-                        print(f"Found preferred resolution: {preferred_res}p")
-                        preferred_found = True
-                        break
+            target_playlist = next(
+                (p for bw, h, p in candidates if h == height_to_find), None)
+            if target_playlist:
+                print(f"Found preferred resolution: {preferred_res}p")
         except ValueError:
             print(f"Warning: Invalid preferred resolution '{preferred_res}'.")
-        except Exception as e:
-            print(f"Warning: Error checking resolution: {e}")
 
-    # If preferred not found or not specified, find the best available (highest bandwidth)
-    if not preferred_found:
+    # If preferred not found or not specified, find the best available
+    # (highest bandwidth, resolution as tie-breaker)
+    if not target_playlist:
         print(
             f"Preferred resolution {preferred_res}p not found/specified. Selecting best available.")
-        for playlist in manifest.playlists:
-            bandwidth = getattr(playlist.stream_info, 'bandwidth', -1)
-            if bandwidth is None:
-                bandwidth = -1
-            current_height = playlist.stream_info.resolution[1] if (
-                playlist.stream_info.resolution and len(playlist.stream_info.resolution) > 1) else 0
-            best_height = target_playlist.stream_info.resolution[1] if (
-                target_playlist and target_playlist.stream_info.resolution and len(target_playlist.stream_info.resolution) > 1) else 0
-
-            # Select based on bandwidth primarily, then resolution as tie-breaker
-            if bandwidth > best_bandwidth:
-                best_bandwidth = bandwidth
-                target_playlist = playlist
-            elif bandwidth == best_bandwidth and current_height > best_height:
-                target_playlist = playlist  # Higher resolution for same bandwidth
-
-    if not target_playlist and manifest.playlists:
-        print("Warning: Could not determine best video playlist. Picking first.")
-        target_playlist = manifest.playlists[0]
-    elif not target_playlist:
+        target_playlist = max(candidates, key=lambda c: (c[0], c[1]))[2]
+
+    if not target_playlist:
         print("Error: Could not determine any video playlist.")
         return None, None, []
 
     # --- Find Associated Audio Tracks ---
-    selected_audio_group_id = getattr(
-        target_playlist.stream_info, 'audio', None)
+    selected_audio_group_id = target_playlist.stream_info.audio
     if selected_audio_group_id:
         print(
             f"Video stream associated with audio group: {selected_audio_group_id}")
-        found_audios = []
+        audio_by_group = {}
         for media in manifest.media:
-            if media.type == 'AUDIO' and media.group_id == selected_audio_group_id and media.uri:
-                audio_info = {
-                    'uri': urljoin(manifest.base_uri, media.uri),
-                    'lang': getattr(media, 'language', None),
-                    'name': getattr(media, 'name', None),
-                    'default': getattr(media, 'default', False)
-                }
-                found_audios.append(audio_info)
-                # Identify primary audio (prefer 'default', fallback to first found)
-                if audio_info['default']:
-                    primary_audio_info = audio_info
-                elif not primary_audio_info:  # If default not found yet, take the first one
-                    primary_audio_info = audio_info
+            if media.type == 'AUDIO' and media.uri:
+                audio_by_group.setdefault(media.group_id, []).append(media)
+
+        found_audios = []
+        resolve_uri = make_uri_resolver(manifest.base_uri)
+        for media in audio_by_group.get(selected_audio_group_id, []):
+            audio_info = {
+                'uri': resolve_uri(media.uri),
+                'lang': media.language,
+                'name': media.name,
+                'default': media.default
+            }
+            found_audios.append(audio_info)
+            # Identify primary audio (prefer 'default', fallback to first found)
+            if audio_info['default']:
+                primary_audio_info = audio_info
+            elif not primary_audio_info:  # If default not found yet, take the first one
+                primary_audio_info = audio_info
 
         if not found_audios:
             print(
@@ -162,7 +421,7 @@ def get_video_and_audio_playlists(manifest, preferred_res=None):
     res_info = "Unknown Resolution"
     if target_playlist.stream_info.resolution and len(target_playlist.stream_info.resolution) > 1:
         res_info = f"{target_playlist.stream_info.resolution[1]}p"
-    bw_info = f"Bandwidth: {getattr(target_playlist.stream_info, 'bandwidth', 'N/A')}"
+    bw_info = f"Bandwidth: {target_playlist.stream_info.bandwidth or 'N/A'}"
     print(f"Selected video stream: {res_info} ({bw_info})")
 
     return target_playlist, primary_audio_info, all_audio_infos
@@ -176,12 +435,13 @@ def get_all_subtitle_playlists(manifest):
 
     print("Searching for subtitle tracks...")
     count = 0
+    resolve_uri = make_uri_resolver(manifest.base_uri)
     for media in manifest.media:
         if media.type == 'SUBTITLES' and media.uri:  # Ensure URI exists
             sub_info = {
-                'uri': urljoin(manifest.base_uri, media.uri),
-                'lang': getattr(media, 'language', None),
-                'name': getattr(media, 'name', None)
+                'uri': resolve_uri(media.uri),
+                'lang': media.language,
+                'name': media.name
             }
             subtitle_infos.append(sub_info)
             count += 1
@@ -195,7 +455,8 @@ def get_all_subtitle_playlists(manifest):
 # --- Download Logic ---
 
 class Downloader:
-    def __init__(self, url, output_dir, filename_base, preferred_res, download_subs, gui_queue):
+    def __init__(self, url, output_dir, filename_base, preferred_res, download_subs, gui_queue,
+                 aux_executor=None):
         self.m3u8_url = url
         # Base output directory (e.g., Downloads)
         self.base_output_dir = output_dir
@@ -209,63 +470,153 @@ class Downloader:
         self.gui_queue = gui_queue
         self.stop_event = threading.Event()
         self.item_id = None  # Will be set by the GUI
+        # Runs subtitle and extra-audio jobs; the GUI shares one across downloads
+        self.aux_executor = aux_executor
+        self._last_status = None  # Last status sent to the GUI (for rate limiting)
+        self._last_progress = None
+        self._last_update_ts = 0.0
+        # Shared across all requests of this download (pooled, retries handled by urllib3)
+        self.session = create_http_session()
+        # Segment workers each get their own session (no pool lock shared between threads)
+        self._tls = threading.local()
+        self._worker_sessions = []
+        self._worker_sessions_lock = threading.Lock()
+        # Caps in-flight segment requests across all streams of this download
+        self._segment_slots = threading.BoundedSemaphore(SEGMENT_WORKERS)
 
     def _update_status(self, status, progress=None):
         """ Safely send status update to the GUI queue. """
         # Avoid sending updates if stop event is already set, reduces queue noise during stopping
         if self.stop_event.is_set() and status not in ["Stopping...", "Stopped", "FINISHED"]:
             return
+        # Ensure progress is between 0 and 100
+        if progress is not None:
+            progress = max(0, min(100, int(progress)))
+        # Nothing the GUI would show differently
+        if status == self._last_status and progress == self._last_progress:
+            return
+        # Rate-limit repeated download-progress updates (~10/s); other statuses always go through
+        now = time.monotonic()
+        if (status == self._last_status and status.startswith("DL ") and progress != 100
+                and now - self._last_update_ts < 0.1):
+            return
+        self._last_status = status
+        self._last_progress = progress
+        self._last_update_ts = now
         try:
-            update = {"id": self.item_id, "status": status}
-            if progress is not None:
-                # Ensure progress is between 0 and 100
-                update["progress"] = max(0, min(100, int(progress)))
-            self.gui_queue.put(update)
+            # Queue messages are (item_id, status, progress) tuples; progress may be None
+            self.gui_queue.put((self.item_id, status, progress))
         except Exception as e:
             print(f"Error updating status via queue: {e}")
 
-    def _download_segment(self, segment_uri, temp_dir, index, total_segments, session):
+    def _thread_session(self):
+        """Returns the calling worker thread's own HTTP session, creating it on first use."""
+        session = getattr(self._tls, 'session', None)
+        if session is None:
+            session = self._tls.session = create_http_session()
+            with self._worker_sessions_lock:
+                self._worker_sessions.append(session)
+        return session
+
+    def _close_worker_sessions(self):
+        """Closes all per-thread segment sessions created by this download."""
+        with self._worker_sessions_lock:
+            sessions, self._worker_sessions = self._worker_sessions, []
+        for session in sessions:
+            session.close()
+
+    def _download_segment(self, segment_uri, temp_dir, index, total_segments):
+        """ Downloads a single segment file once one of the download's segment slots is free. """
+        with self._segment_slots:
+            return self._fetch_segment(segment_uri, temp_dir, index, total_segments)
+
+    def _fetch_segment(self, segment_uri, temp_dir, index, total_segments):
         """ Downloads a single segment file with retries. """
         if self.stop_event.is_set():
             return False  # Stop requested
 
-        # Ensure the temp directory exists just before writing
-        os.makedirs(temp_dir, exist_ok=True)
         # Determine expected extension (usually .ts or .aac for audio only)
         # For simplicity, we assume .ts for video/primary audio segments downloaded this way
         segment_filename = os.path.join(temp_dir, f"segment_{index:05d}.ts")
 
+        # Connection/read errors and 5xx responses are retried (with backoff) by the
+        # session adapter, so when session.get gives up the segment has failed; this
+        # loop only retries (with a Range resume) failures while reading the body.
+        session = self._thread_session()
         attempts = 3
         for attempt in range(attempts):
             if self.stop_event.is_set():
                 return False
             try:
-                headers = {'User-Agent': USER_AGENT}
+                # After a failed attempt, resume from what was already written
+                existing_bytes = 0
+                request_headers = None
+                if attempt > 0:
+                    try:
+                        existing_bytes = os.path.getsize(segment_filename)
+                    except OSError:
+                        existing_bytes = 0
+                    if existing_bytes:
+                        request_headers = {'Range': f"bytes={existing_bytes}-",
+                                           'Accept-Encoding': 'identity'}
+
                 # Increased timeout for potentially larger segments or slow connections
                 response = session.get(segment_uri, stream=True, timeout=(
                     # (connect_timeout, read_timeout)
-                    10, 30), headers=headers)
+                    10, 30), headers=request_headers)
+                if existing_bytes and response.status_code == 416:
+                    # Server won't serve the requested range; start over on the next attempt
+                    response.close()
+                    os.remove(segment_filename)
+                    continue
                 response.raise_for_status()
+                # Let urllib3 undo any Content-Encoding while we read the raw stream
+                response.raw.decode_content = True
+
+                resumed = (existing_bytes > 0 and response.status_code == 206 and
+                           response.headers.get('Content-Range', '').startswith(f"bytes {existing_bytes}-"))
+                if existing_bytes and not resumed and response.status_code == 206:
+                    # Partial content that doesn't line up with our file; retry from scratch
+                    response.close()
+                    os.remove(segment_filename)
+                    continue
 
-                with open(segment_filename, 'wb') as f:
-                    # Slightly larger chunk size
-                    for chunk in response.iter_content(chunk_size=8192 * 4):
-                        if self.stop_event.is_set():
-                            f.close()  # Attempt to close file
-                            try:
-                                # Clean up partial segment
-                                os.remove(segment_filename)
-                            except OSError:
-                                pass
-                            return False
-                        if chunk:  # filter out keep-alive new chunks
-                            f.write(chunk)
+                # Append when resuming; a plain 200 means the server sent the whole segment
+                # Unbuffered: each chunk read goes straight to a write() syscall
+                with open(segment_filename, 'ab' if resumed else 'wb', buffering=0) as f:
+                    # Copy loop runs in C; segments are small so the stop
+                    # request is honoured once the current one is written.
+                    # Moderate read size: a broken read loses its chunk, and
+                    # everything before it is kept for a Range resume.
+                    shutil.copyfileobj(response.raw, f, length=256 * 1024)
+                    # Segments are read back once by ffmpeg; keep them out of the page cache
+                    _drop_page_cache(f.fileno())
+                    segment_size = f.tell()
+                if self.stop_event.is_set():
+                    try:
+                        # Clean up segment of a stopped download
+                        os.remove(segment_filename)
+                    except OSError:
+                        pass
+                    return False
+                if segment_size == 0:
+                    # Nothing to merge; count it as failed rather than passing an empty file on
+                    print(f"Segment {index} URI {segment_uri} came back empty.")
+                    return False
                 return True  # Success
 
+            except (requests.exceptions.RetryError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                # Raised by session.get once the adapter's own retries are used up
+                # (RetryError for 5xx, ConnectionError/Timeout for connect and read failures)
+                print(
+                    f"Error downloading segment {index} URI {segment_uri}: retries exhausted ({e}).")
+                return False
+
             except requests.exceptions.RequestException as e:
                 print(
                     f"Error downloading segment {index} URI {segment_uri} (Attempt {attempt + 1}/{attempts}): {e}")
-                # Don't retry immediately on 4xx errors
+                # Don't retry on 4xx errors
                 response_status = getattr(e, 'response', None)
                 if response_status is not None and 400 <= response_status.status_code < 500:
                     print(
@@ -273,14 +624,12 @@ class Downloader:
                     return False
                 if self.stop_event.is_set():
                     return False
-                time.sleep(2 * (attempt + 1))  # Exponential backoff slightly
 
             except Exception as e:  # Catch other potential errors like file write issues
                 print(
                     f"Unexpected error downloading segment {index} (Attempt {attempt + 1}/{attempts}): {e}")
                 if self.stop_event.is_set():
                     return False
-                time.sleep(2 * (attempt + 1))
 
         print(f"Failed to download segment {index} after {attempts} attempts.")
         return False
@@ -305,7 +654,6 @@ class Downloader:
         final_sub_content = ""
         try:
             self._update_status(f"DL Sub {lang_code}")
-            headers = {'User-Agent': USER_AGENT}
 
             # --- Check if the subtitle URL is an M3U8 playlist ---
             is_sub_m3u8 = urlparse(sub_url).path.lower().endswith('.m3u8')
@@ -315,56 +663,61 @@ class Downloader:
                     f"Subtitle {lang_code} is segmented (m3u8). Fetching segments...")
                 # 1. Fetch the subtitle manifest
                 sub_manifest_resp = session.get(
-                    sub_url, timeout=20, headers=headers)
+                    sub_url, timeout=20)
                 sub_manifest_resp.raise_for_status()
-                sub_manifest_text = sub_manifest_resp.text
                 try:
                     # Use the sub_url itself as the base URI for resolving segment paths
-                    sub_manifest = m3u8.loads(sub_manifest_text, uri=sub_url)
+                    sub_manifest = parse_media_playlist(
+                        _playlist_text(sub_manifest_resp), sub_url)
                 except ValueError:  # Try decoding explicitly if parse fails
                     print(
                         f"Initial parse failed for subtitle manifest {lang_code}, trying UTF-8.")
-                    sub_manifest = m3u8.loads(
-                        sub_manifest_resp.content.decode('utf-8', 'ignore'), uri=sub_url)
+                    sub_manifest = parse_media_playlist(
+                        sub_manifest_resp.content.decode('utf-8', 'ignore'), sub_url)
+                segment_uris = [segment.absolute_uri
+                                for segment in sub_manifest.segments]
 
                 # 2. Check if it contains segments
-                if not sub_manifest.segments:
+                if not segment_uris:
                     print(
                         f"Warning: Subtitle manifest for {lang_code} contains no segments.")
                     return False, None  # Treat as failure if no segments
 
-                # 3. Download and concatenate segments
-                segment_contents = []
-                total_sub_segments = len(sub_manifest.segments)
+                # 3. Download segments concurrently, keeping playlist order
+                total_sub_segments = len(segment_uris)
+                segment_contents = [None] * total_sub_segments
                 downloaded_sub_segments = 0
                 # Progress for segments
                 self._update_status(f"DL Sub {lang_code} Segs", 0)
 
-                for i, segment in enumerate(sub_manifest.segments):
-                    if self.stop_event.is_set():
-                        raise InterruptedError("Subtitle download stopped")
-                    segment_uri = urljoin(sub_manifest.base_uri, segment.uri)
-                    try:
-                        segment_resp = session.get(
-                            segment_uri, timeout=15, headers=headers)
-                        segment_resp.raise_for_status()
-                        # Assume segments are UTF-8 encoded VTT fragments
-                        segment_resp.encoding = segment_resp.apparent_encoding or 'utf-8'
-                        segment_text = segment_resp.text
-                        segment_contents.append(segment_text)
-                        downloaded_sub_segments += 1
-                        # Update progress occasionally
-                        if downloaded_sub_segments % 5 == 0 or downloaded_sub_segments == total_sub_segments:
-                            seg_progress = int(
-                                (downloaded_sub_segments / total_sub_segments) * 100)
-                            self._update_status(
-                                f"DL Sub {lang_code} Segs", seg_progress)
-
-                    except requests.exceptions.RequestException as seg_e:
-                        print(
-                            f"Warning: Failed subtitle segment {i+1}/{total_sub_segments} for {lang_code}: {seg_e}. Skipping.")
+                with concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="SubSegDL") as seg_executor:
+                    futures = [seg_executor.submit(session.get, segment_uri, timeout=15)
+                               for segment_uri in segment_uris]
+                    for i, future in enumerate(futures):
+                        if self.stop_event.is_set():
+                            for f in futures[i:]:
+                                f.cancel()
+                            raise InterruptedError("Subtitle download stopped")
+                        try:
+                            segment_resp = future.result()
+                            segment_resp.raise_for_status()
+                            # Assume segments are UTF-8 encoded VTT fragments
+                            segment_contents[i] = _decode_text_response(
+                                segment_resp)
+                            downloaded_sub_segments += 1
+                            # Update progress occasionally
+                            if downloaded_sub_segments % 5 == 0 or downloaded_sub_segments == total_sub_segments:
+                                seg_progress = int(
+                                    (downloaded_sub_segments / total_sub_segments) * 100)
+                                self._update_status(
+                                    f"DL Sub {lang_code} Segs", seg_progress)
+
+                        except requests.exceptions.RequestException as seg_e:
+                            print(
+                                f"Warning: Failed subtitle segment {i+1}/{total_sub_segments} for {lang_code}: {seg_e}. Skipping.")
 
                 # 4. Join segments. Ensure WEBVTT header is present only once.
+                segment_contents = [s for s in segment_contents if s is not None]
                 if not segment_contents:
                     print(
                         f"Warning: No subtitle segments downloaded successfully for {lang_code}.")
@@ -392,10 +745,9 @@ class Downloader:
                 # --- It's likely a direct VTT file URL ---
                 print(
                     f"Subtitle {lang_code} appears to be a direct file. Downloading...")
-                response = session.get(sub_url, timeout=30, headers=headers)
+                response = session.get(sub_url, timeout=30)
                 response.raise_for_status()
-                response.encoding = response.apparent_encoding or 'utf-8'
-                final_sub_content = response.text
+                final_sub_content = _decode_text_response(response)
 
                 # Ensure WEBVTT header
                 if not final_sub_content.strip().startswith('WEBVTT'):
@@ -409,7 +761,6 @@ class Downloader:
                     f"Warning: No actual subtitle content gathered for {lang_code}.")
                 return False, None
 
-            os.makedirs(os.path.dirname(output_filename), exist_ok=True)
             with open(output_filename, 'w', encoding='utf-8', errors='ignore') as f:
                 f.write(final_sub_content)
 
@@ -471,61 +822,67 @@ class Downloader:
             output_filename
         ]
 
-        # Ensure output directory exists before calling ffmpeg
-        os.makedirs(os.path.dirname(output_filename), exist_ok=True)
-
         # Run ffmpeg command, using the helper
         success = self._run_ffmpeg_command(cmd, f"Extra Audio {lang_code}")
 
         if success:
-            if os.path.exists(output_filename) and os.path.getsize(output_filename) > 100:
-                print(f"Extra audio track saved: {output_filename}")
-                return True
-            else:
-                print(
-                    f"Warning: ffmpeg reported success for audio {lang_code}, but output file is missing/small.")
-                self._update_status(f"Error Audio {lang_code}")
-                # Optionally remove the bad file
-                try:
-                    if os.path.exists(output_filename):
-                        os.remove(output_filename)
-                except OSError:
-                    pass
-                return False
-        else:
-            # Error status already set by _run_ffmpeg_command
-            return False
+            # ffmpeg exited cleanly and reported progress=end, so the file is complete
+            print(f"Extra audio track saved: {output_filename}")
+        # On failure the error status is already set by _run_ffmpeg_command
+        return success
 
-    def _download_segments_for_stream(self, media_manifest, stream_type, temp_sub_dir, session):
-        """Downloads all segments for a given media manifest (video or primary audio)."""
+    def _submit_aux(self, aux_executor, fn, *args):
+        """Submits a job to the aux executor; one that was shut down (app closing) counts as a stop."""
+        try:
+            return aux_executor.submit(fn, *args)
+        except RuntimeError:
+            self.stop_event.set()
+            raise InterruptedError("Aux executor shut down")
+
+    def _fetch_media_playlist(self, uri):
+        """Fetches and parses a media playlist (video or audio) on the shared session."""
+        response = self.session.get(uri, timeout=15)
+        response.raise_for_status()
+        return parse_media_playlist(_playlist_text(response), uri)
+
+    def _download_segments_for_stream(self, media_manifest, stream_type, temp_sub_dir, report_progress=True):
+        """Downloads all segments for a given media manifest (video or primary audio).
+
+        Returns (full_success, segment_paths), where segment_paths lists the files that
+        were downloaded, in playlist order. With report_progress=False only errors are
+        shown, for a stream running alongside another one.
+        """
         if self.stop_event.is_set():
-            return False, 0
+            return False, []
 
         segments = media_manifest.segments
         if not segments:
             print(f"Warning: No segments found in {stream_type} playlist.")
-            return True, 0  # Not an error, just nothing to download
+            return True, []  # Not an error, just nothing to download
 
         total_segments = len(segments)
         print(f"Found {total_segments} {stream_type} segments to download.")
         # Initial status update
-        self._update_status(f"DL {stream_type.capitalize()}", 0)
+        if report_progress:
+            self._update_status(f"DL {stream_type.capitalize()}", 0)
 
-        os.makedirs(temp_sub_dir, exist_ok=True)  # Ensure sub-directory exists
+        # Created once per stream; segment workers rely on it existing
+        os.makedirs(temp_sub_dir, exist_ok=True)
 
         downloaded_count = 0
-        max_workers = 10  # Concurrency level
+        # Filled in by index as segments finish so the merge never has to rescan the directory
+        segment_paths = [None] * total_segments
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=SEGMENT_WORKERS,
+                                                   thread_name_prefix="SegDL") as executor:
             future_to_segment = {}
             all_futures = []
+            resolve_uri = make_uri_resolver(media_manifest.base_uri)
             for i, segment in enumerate(segments):
                 if self.stop_event.is_set():
                     break
-                segment_full_uri = urljoin(
-                    media_manifest.base_uri, segment.uri)
                 future = executor.submit(
-                    self._download_segment, segment_full_uri, temp_sub_dir, i, total_segments, session)
+                    self._download_segment, resolve_uri(segment.uri), temp_sub_dir, i, total_segments)
                 future_to_segment[future] = i
                 all_futures.append(future)
 
@@ -549,10 +906,12 @@ class Downloader:
                     success = future.result()
                     if success:
                         downloaded_count += 1
+                        segment_paths[segment_index] = os.path.join(
+                            temp_sub_dir, f"segment_{segment_index:05d}.ts")
                         progress = int(
                             (downloaded_count / total_segments) * 100)
                         # Update progress less frequently
-                        if downloaded_count == total_segments or progress % 5 == 0:
+                        if report_progress and (downloaded_count == total_segments or progress % 5 == 0):
                             self._update_status(
                                 f"DL {stream_type.capitalize()}", progress)
                     else:
@@ -579,7 +938,7 @@ class Downloader:
             final_progress = int(
                 (downloaded_count / total_segments) * 100) if total_segments > 0 else 0
             self._update_status("Stopping...", final_progress)
-            return False, downloaded_count
+            return False, [path for path in segment_paths if path]
 
         # Check final count
         full_success = (downloaded_count == total_segments)
@@ -587,44 +946,89 @@ class Downloader:
             print(
                 f"Warning: Only {downloaded_count}/{total_segments} {stream_type} segments downloaded successfully.")
 
-        final_progress = int((downloaded_count / total_segments)
-                             * 100) if total_segments > 0 else 100
-        self._update_status(
-            f"DL {stream_type.capitalize()} Done", final_progress)
+        if report_progress:
+            final_progress = int((downloaded_count / total_segments)
+                                 * 100) if total_segments > 0 else 100
+            self._update_status(
+                f"DL {stream_type.capitalize()} Done", final_progress)
 
-        return full_success, downloaded_count
+        return full_success, [path for path in segment_paths if path]
 
-    def _create_ffmpeg_list_file(self, temp_sub_dir, list_filename, total_segments):
-        """Creates the ffmpeg concat list file for segments in a subdirectory."""
-        actual_segment_count = 0
+    def _create_ffmpeg_list_file(self, list_filename, segment_paths):
+        """Writes the ffmpeg concat list file for the given segment files."""
         try:
-            with open(list_filename, 'w', encoding='utf-8') as f:
-                missing_count = 0
-                for i in range(total_segments):
-                    segment_file = os.path.join(
-                        temp_sub_dir, f"segment_{i:05d}.ts")
-                    if os.path.exists(segment_file) and os.path.getsize(segment_file) > 0:
-                        escaped_path = segment_file.replace(
-                            '\\', '/').replace("'", "'\\''")
-                        f.write(f"file '{escaped_path}'\n")
-                        actual_segment_count += 1
-                    else:
-                        missing_count += 1
-                        # Log first few missing, then just total at the end
-                        if missing_count <= 5:
-                            print(
-                                f"Warning: Segment file {segment_file} missing or empty, skipping merge for it.")
-
-            if actual_segment_count < total_segments:
-                print(
-                    f"Warning: Found {actual_segment_count}/{total_segments} valid segment files for merging in {temp_sub_dir}. ({missing_count} missing/empty)")
+            with open(list_filename, 'wb') as f:
+                f.write(_ffmpeg_concat_list(segment_paths))
         except Exception as e:
             print(f"Error creating ffmpeg list file {list_filename}: {e}")
             return 0
-        return actual_segment_count
+        return len(segment_paths)
 
-    def _run_ffmpeg_command(self, cmd, step_name):
-        """Runs an ffmpeg command and checks the result."""
+    def _feed_ffmpeg_stdin(self, process, stdin_bytes, segment_paths):
+        """Writes stdin_bytes, then the segment files back to back, into ffmpeg's stdin and closes it."""
+        try:
+            if stdin_bytes:
+                process.stdin.buffer.write(stdin_bytes)
+            for path in segment_paths or ():
+                if self.stop_event.is_set():
+                    # A clean EOF would let ffmpeg finalize a truncated file
+                    process.terminate()
+                    break
+                with open(path, 'rb') as seg:
+                    # Binary writes go through the buffer under the text-mode pipe
+                    shutil.copyfileobj(
+                        seg, process.stdin.buffer, length=1 << 20)
+        except (BrokenPipeError, OSError) as e:
+            # ffmpeg exited early; its return code carries the real error
+            print(f"Stopped feeding segments to ffmpeg: {e}")
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def _pump_ffmpeg_stderr(self, process, stderr_lines, failure_markers=(), stderr_state=None):
+        """Drains ffmpeg's stderr as it arrives; stderr_lines (a bounded deque) keeps the tail.
+
+        The first line containing one of failure_markers is kept in stderr_state['failure'].
+        """
+        for line in iter(process.stderr.readline, ''):
+            if line.strip():
+                stderr_lines.append(line)
+                if (failure_markers and stderr_state['failure'] is None
+                        and any(marker in line for marker in failure_markers)):
+                    stderr_state['failure'] = line.strip()
+
+    def _pump_ffmpeg_progress(self, process, progress_state, total_duration, progress_status):
+        """Reads ffmpeg's -progress key=value stream from stdout.
+
+        Reports progress from out_time_us when total_duration is set, and records in
+        progress_state['ended'] whether ffmpeg reported progress=end (output finalized).
+        """
+        last_pct = -1
+        for line in iter(process.stdout.readline, ''):
+            key, _, value = line.strip().partition('=')
+            if key == 'out_time_us' and total_duration:
+                try:
+                    elapsed = int(value) / 1000000
+                except ValueError:
+                    continue  # "N/A" until the first packet is written
+                pct = min(100, max(0, int(elapsed / total_duration * 100)))
+                if pct != last_pct:
+                    last_pct = pct
+                    self._update_status(progress_status, pct)
+            elif key == 'progress' and value == 'end':
+                progress_state['ended'] = True
+
+    def _run_ffmpeg_command(self, cmd, step_name, total_duration=None, progress_status="Merging",
+                            stdin_bytes=None, stdin_paths=None, failure_markers=()):
+        """Runs an ffmpeg command and checks the result.
+
+        If total_duration (seconds) is given, merge progress is reported under progress_status.
+        stdin_bytes and/or the files in stdin_paths are streamed into ffmpeg's stdin (for 'pipe:0' inputs).
+        failure_markers: stderr substrings (logged at warning level) that fail the run even on exit code 0.
+        The output file (last argument of cmd) is deleted if a stop is requested meanwhile.
+        """
         if self.stop_event.is_set():
             print(f"Skipping ffmpeg {step_name} due to stop request.")
             return False
@@ -638,23 +1042,79 @@ class Downloader:
 
         process = None
         try:
+            # Only errors on stderr; progress comes as key=value lines on stdout
+            loglevel = 'warning' if failure_markers else 'error'
+            cmd = [cmd[0], '-hide_banner', '-loglevel', loglevel,
+                   '-nostats', '-progress', 'pipe:1'] + cmd[1:]
             # Capture stderr to check for errors, use utf-8 ignore errors for decoding
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            use_stdin = stdin_bytes is not None or stdin_paths is not None
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE if use_stdin else None,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                                        startupinfo=startupinfo, encoding='utf-8', errors='ignore')
-            stdout, stderr = process.communicate()  # Wait for completion
+            feeder = None
+            if use_stdin:
+                feeder = threading.Thread(target=self._feed_ffmpeg_stdin,
+                                          args=(process, stdin_bytes,
+                                                stdin_paths),
+                                          daemon=True, name="ffmpeg-stdin")
+                feeder.start()
+            # Drain stderr on a separate thread so the pipe never fills up;
+            # only the last few lines are kept for the error message
+            stderr_lines = collections.deque(maxlen=16)
+            stderr_state = {'failure': None}
+            pump = threading.Thread(target=self._pump_ffmpeg_stderr,
+                                    args=(process, stderr_lines,
+                                          failure_markers, stderr_state),
+                                    daemon=True, name="ffmpeg-stderr")
+            pump.start()
+            progress_state = {'ended': False}
+            progress_pump = threading.Thread(target=self._pump_ffmpeg_progress,
+                                             args=(process, progress_state,
+                                                   total_duration, progress_status),
+                                             daemon=True, name="ffmpeg-progress")
+            progress_pump.start()
+            # Wait for completion, terminating ffmpeg if a stop is requested
+            while True:
+                try:
+                    process.wait(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.stop_event.is_set():
+                        print(f"Stop requested, terminating ffmpeg {step_name}.")
+                        process.terminate()
+            pump.join()
+            progress_pump.join()
+            if feeder is not None:
+                feeder.join()
 
-            if process.returncode != 0:
-                error_lines = stderr.strip().splitlines()
-                brief_error = error_lines[-1] if error_lines else "Unknown ffmpeg error"
+            if self.stop_event.is_set():
+                # ffmpeg may still have finished "successfully" on a cut-short input
+                print(f"ffmpeg {step_name} interrupted by stop request.")
+                output_path = cmd[-1]
+                if os.path.exists(output_path):
+                    try:
+                        os.remove(output_path)
+                    except OSError as e:
+                        print(f"Warning: Could not remove partial output {output_path}: {e}")
+                return False
+            elif process.returncode != 0:
+                brief_error = stderr_lines[-1].strip() if stderr_lines else "Unknown ffmpeg error"
                 print(
                     f"ffmpeg {step_name} failed! Code: {process.returncode}. Error: {brief_error}")
-                # print(f"--- Full ffmpeg stderr ---\n{stderr}\n---") # Uncomment for full debug
+                # print(f"--- Full ffmpeg stderr ---\n{''.join(stderr_lines)}\n---") # Uncomment for full debug
                 self._update_status(f"Error Merge ({brief_error[:30]})")
                 return False
+            elif stderr_state['failure'] is not None:
+                # e.g. the HLS demuxer skipped a segment: the output has a gap
+                print(f"ffmpeg {step_name} reported a failure: {stderr_state['failure']}")
+                self._update_status("Error Merge (segments skipped)")
+                return False
+            elif not progress_state['ended']:
+                # Exit code 0 without progress=end: the output was never finalized
+                print(f"ffmpeg {step_name} exited without finishing its output.")
+                self._update_status("Error Merge (incomplete)")
+                return False
             else:
-                # Optional: Check stderr for warnings even on success?
-                # if "warning" in stderr.lower():
-                #    print(f"ffmpeg {step_name} completed with warnings:\n{stderr[-500:]}") # Log last part of stderr
                 print(f"ffmpeg {step_name} successful.")
                 return True
 
@@ -667,77 +1127,92 @@ class Downloader:
             self._update_status(f"Error: ffmpeg execution")
             return False
 
-    def _merge_muxed_ffmpeg(self, video_temp_dir, output_filename, total_segments):
+    def _download_direct_ffmpeg(self, video_uri, output_filename, total_duration=None):
+        """Lets ffmpeg's HLS demuxer fetch a single (muxed) stream straight into the MP4."""
+        if self.stop_event.is_set():
+            return False
+        self._update_status("DL (ffmpeg)", 0)
+
+        cmd = [FFMPEG_PATH, '-nostdin',
+               '-headers', f"User-Agent: {USER_AGENT}\r\n", '-i', video_uri,
+               '-map', '0:v?', '-map', '0:a?', '-c', 'copy', '-y', output_filename]
+
+        # Success means ffmpeg exited cleanly, reported progress=end and skipped no segment
+        return self._run_ffmpeg_command(
+            cmd, "Direct HLS Download", total_duration, "DL (ffmpeg)",
+            failure_markers=_FFMPEG_HLS_FAILURE_MARKERS)
+
+    def _merge_muxed_ffmpeg(self, output_filename, segment_paths, total_duration=None):
         """Merges segments when audio is assumed to be muxed with video."""
         if self.stop_event.is_set():
             return False
         self._update_status("Merging")
 
-        # Create list file directly in the video segments directory
-        list_filename = os.path.join(video_temp_dir, "ffmpeg_list.txt")
-        actual_segment_count = self._create_ffmpeg_list_file(
-            video_temp_dir, list_filename, total_segments)
-
-        if actual_segment_count == 0:
+        if not segment_paths:
             print("Error: No valid segments found to merge.")
             self._update_status("Error: No Segments")
             return False
 
-        cmd = [
-            FFMPEG_PATH, '-nostdin', '-f', 'concat', '-safe', '0',
-            '-i', list_filename,
-            # '-fflags', '+genpts', # Sometimes needed if timestamps are bad, potentially slower
-            '-c', 'copy', '-y', output_filename
-        ]
-        success = self._run_ffmpeg_command(cmd, "Muxed Merge")
-        if success:
-            if not os.path.exists(output_filename) or os.path.getsize(output_filename) < 100:
-                print("Warning: ffmpeg success, but output file missing/small.")
-                self._update_status("Error Merge (empty file)")
-                success = False
+        if _is_mpegts_file(segment_paths[0]):
+            # MPEG-TS segments concatenate byte-wise: stream them straight into a
+            # single remux instead of going through the concat demuxer
+            cmd = [
+                FFMPEG_PATH, '-f', 'mpegts', '-i', 'pipe:0',
+                '-c', 'copy', '-f', 'mp4', '-y', output_filename
+            ]
+            success = self._run_ffmpeg_command(
+                cmd, "Muxed Merge (TS pipe)", total_duration, "Merging", stdin_paths=segment_paths)
+        else:
+            # The concat list goes to ffmpeg's stdin; nothing is written to disk
+            cmd = [
+                FFMPEG_PATH, '-f', 'concat', '-safe', '0',
+                '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0',
+                # '-fflags', '+genpts', # Sometimes needed if timestamps are bad, potentially slower
+                '-c', 'copy', '-y', output_filename
+            ]
+            success = self._run_ffmpeg_command(
+                cmd, "Muxed Merge", total_duration, "Merging",
+                stdin_bytes=_ffmpeg_concat_list(segment_paths))
         return success
 
-    def _merge_separate_audio_video_ffmpeg(self, temp_dir, output_filename, total_video_segments, total_audio_segments):
+    def _merge_separate_audio_video_ffmpeg(self, temp_dir, output_filename, video_segment_paths, audio_segment_paths,
+                                           total_duration=None):
         """Merges separate video and primary audio segments."""
         if self.stop_event.is_set():
             return False
         self._update_status("Merging Video/Audio")
 
-        # Define paths to segment directories and list files within the main temp_dir
-        video_temp_dir = os.path.join(temp_dir, "video")
-        # Specific subdir for primary audio
-        audio_temp_dir = os.path.join(temp_dir, "audio_primary")
-        video_list_file = os.path.join(temp_dir, "ffmpeg_video_list.txt")
-        audio_list_file = os.path.join(
-            temp_dir, "ffmpeg_audio_primary_list.txt")
-
-        # Create list files
-        actual_video_segments = self._create_ffmpeg_list_file(
-            video_temp_dir, video_list_file, total_video_segments)
-        actual_audio_segments = self._create_ffmpeg_list_file(
-            audio_temp_dir, audio_list_file, total_audio_segments)
-
-        if actual_video_segments == 0:
+        if not video_segment_paths:
             print("Error: No valid video segments found to merge.")
             self._update_status("Error: No Video Segments")
             return False
 
+        # Only one input can come from stdin: the video list is piped, the audio list
+        # is written next to the segment subdirectories
+        actual_audio_segments = 0
+        if audio_segment_paths:
+            audio_list_file = os.path.join(
+                temp_dir, "ffmpeg_audio_primary_list.txt")
+            actual_audio_segments = self._create_ffmpeg_list_file(
+                audio_list_file, audio_segment_paths)
+
         cmd = []
         step_name = ""
         if actual_audio_segments == 0:
             print("Warning: No valid primary audio segments found. Merging video-only.")
             cmd = [
-                FFMPEG_PATH, '-nostdin', '-f', 'concat', '-safe', '0',
-                '-i', video_list_file,
+                FFMPEG_PATH, '-f', 'concat', '-safe', '0',
+                '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0',
                 # '-fflags', '+genpts',
                 '-c', 'copy', '-y', output_filename
             ]
             step_name = "Video-Only Merge (No Audio Segments)"
         else:
             cmd = [
-                FFMPEG_PATH, '-nostdin',
-                # Input 0 (Video)
-                '-f', 'concat', '-safe', '0', '-i', video_list_file,
+                FFMPEG_PATH,
+                # Input 0 (Video, list on stdin)
+                '-f', 'concat', '-safe', '0',
+                '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0',
                 # Input 1 (Audio)
                 '-f', 'concat', '-safe', '0', '-i', audio_list_file,
                 '-map', '0:v:0?', '-map', '1:a:0?',  # Map first video and audio streams
@@ -746,12 +1221,9 @@ class Downloader:
             ]
             step_name = "Separate Audio/Video Merge"
 
-        success = self._run_ffmpeg_command(cmd, step_name)
-        if success:
-            if not os.path.exists(output_filename) or os.path.getsize(output_filename) < 100:
-                print("Warning: ffmpeg success, but output file missing/small.")
-                self._update_status("Error Merge (empty file)")
-                success = False
+        success = self._run_ffmpeg_command(
+            cmd, step_name, total_duration, "Merging Video/Audio",
+            stdin_bytes=_ffmpeg_concat_list(video_segment_paths))
         return success
 
     def run_download(self):
@@ -766,6 +1238,7 @@ class Downloader:
             return
 
         # --- Initialization ---
+        # Subtitle and extra audio files are written here without further checks
         try:
             os.makedirs(self.item_output_dir, exist_ok=True)
         except OSError as e:
@@ -787,25 +1260,23 @@ class Downloader:
         total_video_segments = 0
         total_primary_audio_segments = 0
         extra_audio_success_count = 0  # Count successful extra audio downloads
-        session = requests.Session()
+        session = self.session
+        aux_executor = self.aux_executor
+        own_aux_executor = None
+        if aux_executor is None:
+            aux_executor = own_aux_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=AUX_WORKERS, thread_name_prefix="AuxDL")
+        aux_futures = []  # This download's jobs on the (possibly shared) aux executor
 
         try:
             os.makedirs(temp_dir, exist_ok=True)
 
             self._update_status("Fetching Manifest")
-            headers = {'User-Agent': USER_AGENT}
             manifest_response = session.get(
-                self.m3u8_url, timeout=(10, 20), headers=headers)
+                self.m3u8_url, timeout=(10, 20))
             manifest_response.raise_for_status()
-            manifest_content = manifest_response.text
-            try:
-                master_manifest = m3u8.loads(
-                    manifest_content, uri=self.m3u8_url)
-            except ValueError:
-                manifest_content = manifest_response.content.decode(
-                    'utf-8', errors='ignore')
-                master_manifest = m3u8.loads(
-                    manifest_content, uri=self.m3u8_url)
+            master_manifest = m3u8.loads(
+                _playlist_text(manifest_response), uri=self.m3u8_url)
 
             # --- Select Streams and Get Info ---
             video_playlist_obj, primary_audio_info, all_audio_infos = get_video_and_audio_playlists(
@@ -813,7 +1284,30 @@ class Downloader:
             all_subtitle_infos = get_all_subtitle_playlists(
                 master_manifest) if self.download_subs else []
 
-            # --- Get Video Manifest ---
+            # --- Start Subtitles (run alongside the media playlist fetches) ---
+            future_to_sub = {}
+            if all_subtitle_infos:
+                print(
+                    f"Starting download of {len(all_subtitle_infos)} subtitle track(s)...")
+                future_to_sub = {self._submit_aux(aux_executor,
+                    self._download_subtitle, sub_info, session): sub_info for sub_info in all_subtitle_infos}
+                aux_futures.extend(future_to_sub)
+
+            # --- Get Video and Primary Audio Manifests (concurrently) ---
+            video_stream_uri = self.m3u8_url
+            video_playlist_future = None
+            audio_playlist_future = None
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="ManifestDL") as manifest_executor:
+                if isinstance(video_playlist_obj, m3u8.model.Playlist):
+                    video_stream_uri = urljoin(
+                        master_manifest.base_uri, video_playlist_obj.uri)
+                    self._update_status("Fetching Video Playlist")
+                    video_playlist_future = manifest_executor.submit(
+                        self._fetch_media_playlist, video_stream_uri)
+                if video_playlist_obj and primary_audio_info:
+                    audio_playlist_future = manifest_executor.submit(
+                        self._fetch_media_playlist, primary_audio_info['uri'])
+
             if not video_playlist_obj:
                 if master_manifest.segments:
                     video_media_manifest = master_manifest
@@ -821,32 +1315,21 @@ class Downloader:
                     all_audio_infos = []
                 else:
                     raise ValueError("Could not determine video stream.")
-            elif isinstance(video_playlist_obj, m3u8.model.Playlist):
-                video_playlist_uri = urljoin(
-                    master_manifest.base_uri, video_playlist_obj.uri)
-                self._update_status("Fetching Video Playlist")
-                media_playlist_response = session.get(
-                    video_playlist_uri, timeout=15, headers=headers)
-                media_playlist_response.raise_for_status()
-                video_media_manifest = m3u8.loads(
-                    media_playlist_response.text, uri=video_playlist_uri)
+            elif video_playlist_future is not None:
+                video_media_manifest = video_playlist_future.result()
             elif isinstance(video_playlist_obj, m3u8.model.M3U8):
                 video_media_manifest = video_playlist_obj
 
             if not video_media_manifest or not video_media_manifest.segments:
                 raise ValueError("Selected video stream contains no segments.")
             total_video_segments = len(video_media_manifest.segments)
+            # Known stream length, used to turn ffmpeg's time= output into merge progress
+            video_duration = sum(
+                segment.duration or 0 for segment in video_media_manifest.segments)
 
-            # --- Get Primary Audio Manifest ---
-            if primary_audio_info:
-                self._update_status("Fetching Primary Audio Playlist")
+            if audio_playlist_future is not None:
                 try:
-                    primary_audio_uri = primary_audio_info['uri']
-                    audio_playlist_response = session.get(
-                        primary_audio_uri, timeout=15, headers=headers)
-                    audio_playlist_response.raise_for_status()
-                    primary_audio_media_manifest = m3u8.loads(
-                        audio_playlist_response.text, uri=primary_audio_uri)
+                    primary_audio_media_manifest = audio_playlist_future.result()
                     if not primary_audio_media_manifest.segments:
                         print("Warning: Primary audio playlist empty.")
                         primary_audio_info = None
@@ -859,82 +1342,83 @@ class Downloader:
                     primary_audio_info = None
                     total_primary_audio_segments = 0
 
-            # --- Download Subtitles (concurrently) ---
-            if all_subtitle_infos:
-                print(
-                    f"Starting download of {len(all_subtitle_infos)} subtitle track(s)...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=3, thread_name_prefix="SubDL") as sub_executor:
-                    future_to_sub = {sub_executor.submit(
-                        self._download_subtitle, sub_info, session): sub_info for sub_info in all_subtitle_infos}
-                    for future in concurrent.futures.as_completed(future_to_sub):
-                        if self.stop_event.is_set():
-                            future.cancel()
-                            continue  # Check stop event during sub downloads
-                        sub_info = future_to_sub[future]
-                        try:
-                            success, saved_path = future.result()
-                            if success and saved_path:
-                                downloaded_sub_paths.append(saved_path)
-                        except concurrent.futures.CancelledError:
-                            pass  # Ignore cancelled futures
-                        except Exception as exc:
-                            print(
-                                f"Subtitle DL ({sub_info.get('lang')}) error: {exc}")
-
-            if self.stop_event.is_set():
-                raise InterruptedError("Stopped during subtitle download")
-
-            # --- Download Video Segments ---
-            if self.stop_event.is_set():
-                raise InterruptedError("Stopped before video download")
-            video_temp_dir = os.path.join(
-                temp_dir, "video") if primary_audio_info else temp_dir
-            video_dl_full_success, downloaded_video_count = self._download_segments_for_stream(
-                video_media_manifest, "video", video_temp_dir, session
-            )
-            if downloaded_video_count == 0 and not self.stop_event.is_set():
-                raise ValueError("Video download failed completely.")
-
-            if self.stop_event.is_set():
-                raise InterruptedError("Stopped during video download")
-
-            # --- Download Primary Audio Segments ---
-            primary_audio_dl_full_success = True
-            downloaded_primary_audio_count = 0
-            primary_audio_temp_dir = None
-            if primary_audio_info and primary_audio_media_manifest:
-                primary_audio_temp_dir = os.path.join(
-                    temp_dir, "audio_primary")
-                primary_audio_dl_full_success, downloaded_primary_audio_count = self._download_segments_for_stream(
-                    primary_audio_media_manifest, "primary audio", primary_audio_temp_dir, session
-                )
+            # --- Direct ffmpeg HLS download (fast path) ---
+            direct_success = False
+            # Only single-rendition, unencrypted playlists: ffmpeg fetches segments one at
+            # a time without retries, so everything else uses the segment downloader
+            if FFMPEG_DIRECT_HLS and not primary_audio_info and _is_plain_media_playlist(video_media_manifest):
+                direct_success = self._download_direct_ffmpeg(
+                    video_stream_uri, final_output_video, video_duration)
+                if self.stop_event.is_set():
+                    raise InterruptedError("Stopped during direct ffmpeg download")
+                if direct_success:
+                    self._update_status("DL (ffmpeg) Done", 100)
+                else:
+                    print("Direct ffmpeg download failed, falling back to segment download.")
+
+            downloaded_video_count = total_video_segments if direct_success else 0
+            downloaded_primary_audio_count = total_primary_audio_segments if direct_success else 0
+            video_segment_paths = []
+            primary_audio_segment_paths = []
+            if not direct_success:
+                # --- Download Video and Primary Audio Segments (concurrently) ---
+                if self.stop_event.is_set():
+                    raise InterruptedError("Stopped before video download")
+                video_temp_dir = os.path.join(
+                    temp_dir, "video") if primary_audio_info else temp_dir
+                primary_audio_temp_dir = None
+                audio_segments_future = None
+                # Both streams share this download's segment slots, so the overlap
+                # doesn't open more connections than a single stream did
+                with concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="StreamDL") as stream_executor:
+                    video_segments_future = stream_executor.submit(
+                        self._download_segments_for_stream, video_media_manifest, "video", video_temp_dir)
+                    if primary_audio_info and primary_audio_media_manifest:
+                        primary_audio_temp_dir = os.path.join(
+                            temp_dir, "audio_primary")
+                        # Video drives the progress column; audio only reports errors
+                        audio_segments_future = stream_executor.submit(
+                            self._download_segments_for_stream, primary_audio_media_manifest,
+                            "primary audio", primary_audio_temp_dir, False)
+
+                video_dl_full_success, video_segment_paths = video_segments_future.result()
+                downloaded_video_count = len(video_segment_paths)
+                primary_audio_dl_full_success = True
+                downloaded_primary_audio_count = 0
+                if audio_segments_future is not None:
+                    primary_audio_dl_full_success, primary_audio_segment_paths = audio_segments_future.result()
+                    downloaded_primary_audio_count = len(
+                        primary_audio_segment_paths)
 
-            if self.stop_event.is_set():
-                raise InterruptedError("Stopped during primary audio download")
+                if self.stop_event.is_set():
+                    raise InterruptedError("Stopped during segment download")
+                if downloaded_video_count == 0:
+                    raise ValueError("Video download failed completely.")
 
             # --- Download Extra Audio Tracks (concurrently) ---
+            # primary_audio_info is one of the all_audio_infos dicts: compare identity, not contents
             extra_audio_infos = [
-                a for a in all_audio_infos if a != primary_audio_info]
+                a for a in all_audio_infos if a is not primary_audio_info]
             if extra_audio_infos:
                 print(
                     f"Starting download of {len(extra_audio_infos)} extra audio track(s)...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="AudioDL") as extra_audio_executor:
-                    future_to_audio = {extra_audio_executor.submit(
-                        self._download_and_save_extra_audio, audio_info, session): audio_info for audio_info in extra_audio_infos}
-                    for future in concurrent.futures.as_completed(future_to_audio):
-                        if self.stop_event.is_set():
-                            future.cancel()
-                            continue  # Check stop event
-                        audio_info = future_to_audio[future]
-                        try:
-                            success = future.result()
-                            if success:
-                                extra_audio_success_count += 1
-                        except concurrent.futures.CancelledError:
-                            pass  # Ignore cancelled futures
-                        except Exception as exc:
-                            print(
-                                f"Extra audio DL ({audio_info.get('lang')}) error: {exc}")
+                future_to_audio = {self._submit_aux(aux_executor,
+                    self._download_and_save_extra_audio, audio_info, session): audio_info for audio_info in extra_audio_infos}
+                aux_futures.extend(future_to_audio)
+                for future in concurrent.futures.as_completed(future_to_audio):
+                    if self.stop_event.is_set():
+                        future.cancel()
+                        continue  # Check stop event
+                    audio_info = future_to_audio[future]
+                    try:
+                        success = future.result()
+                        if success:
+                            extra_audio_success_count += 1
+                    except concurrent.futures.CancelledError:
+                        pass  # Ignore cancelled futures
+                    except Exception as exc:
+                        print(
+                            f"Extra audio DL ({audio_info.get('lang')}) error: {exc}")
 
             if self.stop_event.is_set():
                 raise InterruptedError("Stopped during extra audio download")
@@ -943,19 +1427,43 @@ class Downloader:
             if self.stop_event.is_set():
                 raise InterruptedError("Stop requested before merge")
             merge_successful = False
-            if downloaded_video_count == 0:
+            if direct_success:
+                merge_successful = True  # ffmpeg already wrote the final MP4
+            elif downloaded_video_count == 0:
                 print("No video segments downloaded. Cannot merge MP4.")
                 self._update_status("Error: No Video Segments DL")
             elif primary_audio_info and downloaded_primary_audio_count > 0:
                 merge_successful = self._merge_separate_audio_video_ffmpeg(
-                    temp_dir, final_output_video, total_video_segments, total_primary_audio_segments
+                    temp_dir, final_output_video, video_segment_paths, primary_audio_segment_paths,
+                    video_duration
                 )
             else:
                 print("Merging video (primary audio muxed, missing, or failed)...")
                 merge_successful = self._merge_muxed_ffmpeg(
-                    video_temp_dir, final_output_video, total_video_segments
+                    final_output_video, video_segment_paths, video_duration
                 )
 
+            # --- Collect Subtitles ---
+            # Only after the merge: on the shared aux executor they may queue behind other
+            # downloads' extra audio, and that must not hold up this download's segments
+            for future in concurrent.futures.as_completed(future_to_sub):
+                if self.stop_event.is_set():
+                    future.cancel()
+                    continue  # Check stop event during sub downloads
+                sub_info = future_to_sub[future]
+                try:
+                    success, saved_path = future.result()
+                    if success and saved_path:
+                        downloaded_sub_paths.append(saved_path)
+                except concurrent.futures.CancelledError:
+                    pass  # Ignore cancelled futures
+                except Exception as exc:
+                    print(
+                        f"Subtitle DL ({sub_info.get('lang')}) error: {exc}")
+
+            if self.stop_event.is_set():
+                raise InterruptedError("Stopped during subtitle download")
+
             # --- Final Status ---
             if merge_successful:
                 self._update_status("Completed", 100)
@@ -991,20 +1499,46 @@ class Downloader:
 
         # --- Cleanup ---
         finally:
+            # Aux jobs are normally all collected by now; drop any left behind by an error
+            for future in aux_futures:
+                future.cancel()
+            concurrent.futures.wait(aux_futures)
+            if own_aux_executor:
+                own_aux_executor.shutdown(wait=True)
             session.close()
+            self._close_worker_sessions()
             if os.path.exists(temp_dir):
                 try:
-                    shutil.rmtree(temp_dir)
+                    _fast_rmtree(temp_dir)
                 except OSError as e:
                     print(f"Warning: Error cleaning temp dir {temp_dir}: {e}")
 
             # --- Crucial: Signal that this download thread has finished ---
             if self.item_id:
-                self.gui_queue.put({"id": self.item_id, "status": "FINISHED"})
+                self.gui_queue.put((self.item_id, "FINISHED", None))
             # --- End Signal ---
 
 
 # --- GUI Application Class ---
+class _DownloadItem:
+    """One entry of the download list, mirroring what its Treeview row shows."""
+    __slots__ = ("tree_id", "name", "url", "status", "progress", "values",
+                 "downloader", "future", "finished")
+
+    def __init__(self, tree_id, name, url, status="Pending", progress=0):
+        self.tree_id = tree_id
+        self.name = name
+        self.url = url
+        self.status = status
+        self.progress = progress
+        # Current row values, kept in step by update_item_status
+        self.values = [name, url, status, _PROGRESS_TEXT[progress]]
+        # Set once the item is started: its Downloader and run_download future
+        self.downloader = None
+        self.future = None
+        self.finished = False  # Its FINISHED signal was handled (slot already freed)
+
+
 class DownloadManagerApp:
     def __init__(self, root):
         self.root = root
@@ -1013,17 +1547,38 @@ class DownloadManagerApp:
 
         self.output_directory = tk.StringVar(
             value=os.path.join(os.getcwd(), "Downloads"))
+        self._output_dir = self.output_directory.get()  # Mirrors output_directory (see trace)
+        self._verified_dirs = set()  # Output dirs already created/checked this session
+        self.output_directory.trace_add(
+            "write", self._on_output_directory_changed)
         self.preferred_resolution = tk.StringVar(value=DEFAULT_RESOLUTION)
+        self._preferred_res = DEFAULT_RESOLUTION  # Mirrors preferred_resolution (see trace)
+        self.preferred_resolution.trace_add(
+            "write", self._on_preferred_resolution_changed)
         self.download_subtitles = tk.BooleanVar(value=True)
         self.download_items = {}
-        self.download_threads = {}
-        self.downloader_instances = {}
+        # Item ids in the order they were added; entries that stopped being Pending
+        # (started, stopped or removed) are skipped when popped
+        self.pending_queue = collections.deque()
+        self._dl_name_count = 0  # Items named "DL_<n>", for numbering unnamed imports
         self.gui_queue = queue.Queue()
+        # Subtitle and extra-audio jobs of all downloads share these workers; sized so
+        # long extra-audio jobs of one download can't starve the others (threads start lazily)
+        self.aux_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=AUX_WORKERS * MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="AuxDL")
+        # Reused threads for run_download; admission is still governed by
+        # active_download_count vs. the concurrency setting below
+        self.download_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="DL")
 
         # --- Queue State ---
         self.active_download_count = 0
         self.max_concurrent_var = tk.IntVar(
             value=4)  # Default concurrency limit
+        # Plain-int copy of the limit so the queue loops don't read the Tcl variable
+        self._max_concurrent = self.max_concurrent_var.get()
+        self.max_concurrent_var.trace_add(
+            "write", self._on_max_concurrent_changed)
         self.queue_processing_enabled = False  # Queue is initially paused
         # --- End Queue State ---
 
@@ -1045,7 +1600,9 @@ class DownloadManagerApp:
         self._check_ffmpeg()
         # Add app stop event for graceful shutdown checks
         self.stop_event = threading.Event()
-        self.root.after(100, self.process_gui_queue)
+        self._gui_poll_id = None
+        self._gui_poll_idle = False
+        self._schedule_gui_poll(100)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def _check_ffmpeg(self):
@@ -1093,7 +1650,7 @@ class DownloadManagerApp:
         # Concurrency Limit Setting
         ttk.Label(settings_frame, text="Concurrent DLs:").grid(
             row=2, column=0, padx=2, pady=5, sticky=tk.W)
-        concurrency_spinbox = ttk.Spinbox(settings_frame, from_=1, to=20, textvariable=self.max_concurrent_var,
+        concurrency_spinbox = ttk.Spinbox(settings_frame, from_=1, to=MAX_CONCURRENT_DOWNLOADS, textvariable=self.max_concurrent_var,
                                           width=5, state="readonly", command=self._on_concurrency_change)
         concurrency_spinbox.grid(row=2, column=1, padx=2, pady=5, sticky=tk.W)
 
@@ -1139,20 +1696,33 @@ class DownloadManagerApp:
 
         # Initial Status Bar Message
         self.status_var = tk.StringVar(
-            value=f"Ready (Queue Paused | Max {self.max_concurrent_var.get()} concurrent)")
+            value=f"Ready (Queue Paused | Max {self._max_concurrent} concurrent)")
         status_bar = ttk.Label(self.root, textvariable=self.status_var,
                                relief=tk.SUNKEN, anchor=tk.W, padding="2 5")
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
     # --- GUI Methods ---
+    def _on_max_concurrent_changed(self, *_):
+        try:
+            self._max_concurrent = self.max_concurrent_var.get()
+        except tk.TclError:
+            pass  # Spinbox is mid-edit (empty/non-numeric); keep the last valid limit
+
+    def _on_output_directory_changed(self, *_):
+        self._output_dir = self.output_directory.get()
+        self._verified_dirs.clear()
+
+    def _on_preferred_resolution_changed(self, *_):
+        self._preferred_res = self.preferred_resolution.get()
+
     def _update_active_status(self):
         """Updates the status bar to show current active/limit and queue state."""
         try:
-            limit = self.max_concurrent_var.get()
+            limit = self._max_concurrent
             queue_state = "Running" if self.queue_processing_enabled else "Paused"
             # Determine if truly idle (no active, no pending)
             has_pending = any(
-                info["status"] == "Pending" for info in self.download_items.values())
+                info.status == "Pending" for info in self.download_items.values())
             if not self.queue_processing_enabled and self.active_download_count == 0 and not has_pending:
                 queue_state = "Idle"
             self.status_var.set(
@@ -1181,24 +1751,21 @@ class DownloadManagerApp:
 
     def sort_column(self, col, reverse):
         try:
-            l = []  # Store tuples of (value, item_id)
-            for k in self.tree.get_children(''):
-                try:
-                    l.append((self.tree.set(k, col), k))
-                except tk.TclError:
-                    continue  # Skip deleted item
+            # download_items mirrors every row (update_item_status keeps it in sync),
+            # so sort in Python and only touch Tk to move the rows
             if col == "Progress":
-                def get_progress_val(t):
-                    try:
-                        return int(t[0].replace('%', '').strip())
-                    except:
-                        return -1  # Sort errors first
-                l.sort(key=get_progress_val, reverse=reverse)
+                def sort_key(info):
+                    return info.progress  # Already an int
             else:
-                l.sort(key=lambda t: str(t[0]).lower(), reverse=reverse)
-            for index, (val, k) in enumerate(l):
+                field = col.lower()
+
+                def sort_key(info):
+                    return str(getattr(info, field, "")).lower()
+            ordered = sorted(self.download_items.values(),
+                             key=sort_key, reverse=reverse)
+            for index, info in enumerate(ordered):
                 try:
-                    self.tree.move(k, '', index)
+                    self.tree.move(info.tree_id, '', index)
                 except tk.TclError:
                     continue  # Skip deleted item
             self.tree.heading(
@@ -1219,7 +1786,6 @@ class DownloadManagerApp:
             self.status_var.set("Input area empty.")
             return
 
-        added_count = 0
         links_to_add = []  # Collect items to add before processing
 
         try:
@@ -1236,7 +1802,7 @@ class DownloadManagerApp:
                         if url:
                             links_to_add.append(
                                 {"name": item.get("name"), "url": url})
-                    elif isinstance(item, str) and item.strip().lower().startswith(('http', 'ftp')) and '.m3u8' in item.strip().lower():
+                    elif isinstance(item, str) and _M3U8_LINK_RE.match(item.strip()):
                         # Item is a string that looks like a valid URL
                         url = item.strip()
                         # Name will be generated later
@@ -1262,7 +1828,7 @@ class DownloadManagerApp:
             for line in lines:
                 url = line.strip()
                 # Basic validation for URL format and m3u8 extension
-                if url and url.lower().startswith(('http', 'ftp')) and '.m3u8' in url.lower():
+                if _M3U8_LINK_RE.match(url):
                     # Name will be generated later
                     links_to_add.append({"name": None, "url": url})
                 elif url:
@@ -1282,10 +1848,16 @@ class DownloadManagerApp:
             self._update_active_status()  # Update status bar
             return
 
-        # --- Generate names if missing and add collected items to download list ---
+        # --- Drop URLs already listed (or repeated in this input) before naming them ---
+        existing = self.download_items.keys()
+        seen = set()
+        links_to_add = [link for link in links_to_add
+                        if link["url"] not in existing and link["url"] not in seen and not seen.add(link["url"])]
+
+        # --- Generate names if missing, then add all collected items in one batch ---
         # Better default naming counter, considering existing DL_ items
-        default_name_counter = sum(
-            1 for item_id in self.download_items if self.download_items[item_id]['name'].startswith("DL_")) + 1
+        default_name_counter = self._dl_name_count + 1
+        named_links = []  # (name, url) pairs, in input order
         for link_info in links_to_add:
             url = link_info["url"]
             name = link_info["name"]  # Can be None initially
@@ -1294,12 +1866,9 @@ class DownloadManagerApp:
             if name is None:
                 try:
                     # Attempt to create a descriptive name from URL components
-                    path = urlparse(url).path
-                    base = os.path.basename(path)
-                    gen_name = os.path.splitext(base)[0] if base else ""
+                    gen_name, parent = _names_from_url_path(url)
                     # Fallback if generated name is generic or empty
-                    if not gen_name or gen_name.lower() in ('video', 'manifest', 'playlist', 'index', 'master', 'chunklist'):
-                        parent = os.path.basename(os.path.dirname(path))
+                    if not gen_name or gen_name.lower() in _GENERIC_NAMES:
                         gen_name = parent if parent else f"DL_{default_name_counter}"
                     name = gen_name.replace('-', ' ').replace('_', ' ').strip()
                     default_name_counter += 1
@@ -1308,9 +1877,9 @@ class DownloadManagerApp:
                     name = f"DL_{default_name_counter}"
                     default_name_counter += 1
 
-            # Add the item (with original or generated name) to the download list
-            if self.add_download_item(name, url):
-                added_count += 1
+            named_links.append((name, url))
+
+        added_count = self._bulk_add_download_items(named_links)
 
         # --- Final status update ---
         if added_count > 0:
@@ -1323,60 +1892,75 @@ class DownloadManagerApp:
         self._update_active_status()  # Update active download count status
 
     def add_download_item(self, name, url):
-        item_id = url
-        if item_id in self.download_items:
+        added = self._bulk_add_download_items([(name, url)]) == 1
+        if not added:
             self._update_active_status()
-            return False
-        safe_name = sanitize_filename(name)
-        try:
-            tree_id = self.tree.insert(
-                "", tk.END, iid=item_id, values=(safe_name, url, "Pending", "0%"))
-            self.download_items[item_id] = {
-                "tree_id": tree_id, "name": safe_name, "url": url, "status": "Pending", "progress": 0}
-            return True
-        except Exception as e:
-            print(f"Error adding {name} to treeview: {e}")
-            return False
+        return added
+
+    def _bulk_add_download_items(self, items):
+        """Adds (name, url) pairs as Pending rows; returns how many were new.
+
+        Names are sanitized before any Tk call, so the loop below only inserts rows.
+        """
+        prepared = [(url, sanitize_filename(name), name) for name, url in items
+                    if url not in self.download_items]
+        added_count = 0
+        for url, safe_name, name in prepared:
+            item_id = url
+            if item_id in self.download_items:
+                continue  # Same URL twice in this batch
+            try:
+                tree_id = self.tree.insert(
+                    "", tk.END, iid=item_id, values=(safe_name, url, "Pending", _PROGRESS_TEXT[0]))
+                self.download_items[item_id] = _DownloadItem(tree_id, safe_name, url)
+                self.pending_queue.append(item_id)
+                if safe_name.startswith("DL_"):
+                    self._dl_name_count += 1
+                added_count += 1
+            except Exception as e:
+                print(f"Error adding {name} to treeview: {e}")
+        return added_count
 
     def get_selected_item_ids(self): return self.tree.selection()
 
     def start_single_download(self, item_id):
         """Starts a single download if prerequisites met. Increments active count."""
-        output_dir = self.output_directory.get()
+        output_dir = self._output_dir
         if not output_dir:
             messagebox.showerror(
                 "Error", "Base Output directory not set.", parent=self.root)
             self.update_item_status(item_id, "Error: No Output Dir", 0)
             return False
-        try:
-            os.makedirs(output_dir, exist_ok=True)
-        except OSError as e:
-            messagebox.showerror(
-                "Error", f"Cannot create base output directory: {e}", parent=self.root)
-            self.update_item_status(item_id, "Error: Output Dir Fail", 0)
-            return False
+        if output_dir not in self._verified_dirs:
+            try:
+                os.makedirs(output_dir, exist_ok=True)
+            except OSError as e:
+                messagebox.showerror(
+                    "Error", f"Cannot create base output directory: {e}", parent=self.root)
+                self.update_item_status(item_id, "Error: Output Dir Fail", 0)
+                return False
+            self._verified_dirs.add(output_dir)
 
         if item_id in self.download_items:
             task_info = self.download_items[item_id]
-            name = task_info["name"]
-            url = task_info["url"]
+            name = task_info.name
+            url = task_info.url
             self.update_item_status(item_id, "Starting...", 0)
-            pref_res = self.preferred_resolution.get()
+            pref_res = self._preferred_res
             pref_res = None if pref_res.lower() == "best" else pref_res
             download_subs = self.download_subtitles.get()
 
             downloader = Downloader(url=url, output_dir=output_dir, filename_base=name,
-                                    preferred_res=pref_res, download_subs=download_subs, gui_queue=self.gui_queue)
+                                    preferred_res=pref_res, download_subs=download_subs, gui_queue=self.gui_queue,
+                                    aux_executor=self.aux_executor)
             downloader.item_id = item_id
-            self.downloader_instances[item_id] = downloader
-            thread = threading.Thread(
-                target=downloader.run_download, daemon=True, name=f"DL-{name[:10]}")
-            self.download_threads[item_id] = thread
-
-            self.active_download_count += 1
-            thread.start()  # Increment BEFORE start
-            print(
-                f"Started download for {name}. Active: {self.active_download_count}/{self.max_concurrent_var.get()}")
+            task_info.downloader = downloader
+            self.active_download_count += 1  # Increment BEFORE submit
+            task_info.future = self.download_executor.submit(
+                downloader.run_download)
+            self._wake_gui_queue()
+            log.debug("Started download for %s. Active: %d/%d",
+                      name, self.active_download_count, self._max_concurrent)
             self._update_active_status()
             return True
         else:
@@ -1390,25 +1974,16 @@ class DownloadManagerApp:
         if not self.queue_processing_enabled:
             self._update_active_status()
             return  # Queue paused
-        try:
-            limit = self.max_concurrent_var.get()
-        except (tk.TclError, AttributeError):
-            limit = 0
-
-        while self.active_download_count < limit:
-            next_pending_id = None
-            # Find next PENDING in visual order
-            for item_id in self.tree.get_children(''):
-                if item_id in self.download_items and self.download_items[item_id]["status"] == "Pending":
-                    next_pending_id = item_id
-                    break
-            if next_pending_id:
-                print(
-                    f"Queue: Slot available. Starting: {self.download_items[next_pending_id]['name']}")
-                if not self.start_single_download(next_pending_id):
-                    break  # Stop if start fails
-            else:
-                break  # No more pending items
+        limit = self._max_concurrent
+        while self.active_download_count < limit and self.pending_queue:
+            # Next PENDING in the order items were added
+            next_pending_id = self.pending_queue.popleft()
+            task_info = self.download_items.get(next_pending_id)
+            if task_info is None or task_info.status != "Pending":
+                continue  # Removed, stopped or started by hand since it was queued
+            log.debug("Queue: Slot available. Starting: %s", task_info.name)
+            if not self.start_single_download(next_pending_id):
+                break  # Stop if start fails
         # Update status bar after checking/starting
         self._update_active_status()
 
@@ -1419,13 +1994,13 @@ class DownloadManagerApp:
             self._update_active_status()
             return
         started_count = 0
-        limit = self.max_concurrent_var.get()
+        limit = self._max_concurrent
         processed_count = 0
         limit_hit = False
 
         for item_id in selected_ids:
             processed_count += 1
-            if item_id in self.download_items and self.download_items[item_id]["status"] == "Pending":
+            if item_id in self.download_items and self.download_items[item_id].status == "Pending":
                 if self.active_download_count < limit:
                     if self.start_single_download(item_id):
                         started_count += 1
@@ -1454,17 +2029,17 @@ class DownloadManagerApp:
             task_info = self.download_items.get(item_id)
             if not task_info:
                 continue
-            if item_id in self.downloader_instances:
-                downloader = self.downloader_instances[item_id]
-                if item_id in self.download_threads and self.download_threads[item_id].is_alive():
+            downloader = task_info.downloader
+            if downloader is not None:
+                if not task_info.future.done():
                     if not downloader.stop_event.is_set():
                         downloader.stop_event.set()
                         self.update_item_status(item_id, "Stopping...")
                         stopped_count += 1
-                elif task_info["status"] not in ["Completed", "Stopped", "Error", "Pending"]:
+                elif task_info.status not in ["Completed", "Stopped", "Error", "Pending"]:
                     self.update_item_status(item_id, "Stopped")
                     stopped_count += 1
-            elif task_info["status"] in ["Pending", "Queued"]:
+            elif task_info.status in ["Pending", "Queued"]:
                 self.update_item_status(item_id, "Stopped")
                 stopped_count += 1
         if stopped_count > 0:
@@ -1484,138 +2059,170 @@ class DownloadManagerApp:
         if not selected_ids:
             self._update_active_status()
             return
-        active_ids = [id for id in selected_ids if self.download_items.get(
-            id, {}).get("status") not in ["Pending", "Completed", "Stopped", "Error"]]
+        active_ids = [id for id in selected_ids if id in self.download_items
+                      and self.download_items[id].status not in ["Pending", "Completed", "Stopped", "Error"]]
         confirm = True
         if active_ids:
             confirm = messagebox.askyesno(
                 "Confirm Removal", f"{len(active_ids)} item(s) might be active. Stop before removing?", parent=self.root)
         if confirm:
+            ids_to_delete = list(selected_ids)
             if active_ids:
                 self.stop_downloads(active_ids)
-                time.sleep(0.1)
-            removed_count = 0
-            ids_to_delete = list(selected_ids)
-            needs_queue_check = False
-            for item_id in ids_to_delete:
-                if item_id in self.download_items:
-                    task_info = self.download_items[item_id]
-                    was_counted_active = task_info["status"] not in [
-                        "Pending", "Completed", "Stopped", "Error"]
-                    if item_id in self.downloader_instances:
-                        self.downloader_instances[item_id].stop_event.set()
-                    if was_counted_active:  # Manually adjust count ONLY if removing an item that was active
-                        thread_alive = item_id in self.download_threads and self.download_threads[item_id].is_alive(
-                        )
-                        if not thread_alive and self.active_download_count > 0:  # If wasn't running, won't send FINISHED
-                            self.active_download_count -= 1
-                            needs_queue_check = True
-                            print(
-                                f"Manually decremented active count for removed item {item_id}. Active: {self.active_download_count}")
-
-                    tree_id = task_info["tree_id"]
-                    if self.tree.exists(tree_id):
-                        self.tree.delete(tree_id)
-                    if item_id in self.download_threads:
-                        del self.download_threads[item_id]
-                    if item_id in self.downloader_instances:
-                        del self.downloader_instances[item_id]
-                    del self.download_items[item_id]
-                    removed_count += 1
-            if removed_count > 0:
-                self._update_active_status()  # Update status bar
-            if needs_queue_check:
-                self._check_and_start_pending()  # Check queue if slots might be free
+                # Give the workers a moment to acknowledge the stop without blocking the mainloop
+                self.root.after(100, lambda: self._delete_items(ids_to_delete))
+            else:
+                self._delete_items(ids_to_delete)
         else:
             self.status_var.set("Removal cancelled.")
 
+    def _delete_items(self, ids_to_delete):
+        """Second phase of removal: drop the rows and their bookkeeping."""
+        removed_count = 0
+        needs_queue_check = False
+        for item_id in ids_to_delete:
+            if item_id in self.download_items:
+                task_info = self.download_items[item_id]
+                was_counted_active = task_info.status not in [
+                    "Pending", "Completed", "Stopped", "Error"]
+                if task_info.downloader is not None:
+                    task_info.downloader.stop_event.set()
+                # Manually adjust count ONLY if removing an active item whose FINISHED wasn't handled yet
+                if was_counted_active and not task_info.finished:
+                    still_running = task_info.future is not None and not task_info.future.done()
+                    if not still_running and self.active_download_count > 0:  # If wasn't running, won't send FINISHED
+                        self.active_download_count -= 1
+                        needs_queue_check = True
+                        log.debug("Manually decremented active count for removed item %s. Active: %d",
+                                  item_id, self.active_download_count)
+
+                tree_id = task_info.tree_id
+                if self.tree.exists(tree_id):
+                    self.tree.delete(tree_id)
+                del self.download_items[item_id]
+                if task_info.name.startswith("DL_"):
+                    self._dl_name_count -= 1
+                removed_count += 1
+        if removed_count > 0:
+            self._update_active_status()  # Update status bar
+        if needs_queue_check:
+            self._check_and_start_pending()  # Check queue if slots might be free
+
     def clear_completed_items(self):
         completed_ids = [id for id, info in self.download_items.items(
-        ) if info["status"] == "Completed"]
+        ) if info.status == "Completed"]
         if not completed_ids:
             self._update_active_status()
             return
         removed_count = 0
         for item_id in completed_ids:
             if item_id in self.download_items:
-                tree_id = self.download_items[item_id]["tree_id"]
+                task_info = self.download_items[item_id]
+                tree_id = task_info.tree_id
                 if self.tree.exists(tree_id):
                     self.tree.delete(tree_id)
-                if item_id in self.download_threads:
-                    del self.download_threads[item_id]
-                if item_id in self.downloader_instances:
-                    del self.downloader_instances[item_id]
                 del self.download_items[item_id]
+                if task_info.name.startswith("DL_"):
+                    self._dl_name_count -= 1
                 removed_count += 1
         if removed_count > 0:
             self._update_active_status()
 
     def update_item_status(self, item_id, status, progress=None):
-        if item_id in self.download_items:
-            task_info = self.download_items[item_id]
-            tree_id = task_info["tree_id"]
-            if not self.tree.exists(tree_id):
-                return  # Item removed from UI
-            try:
-                current_values = list(self.tree.item(tree_id, 'values'))
-                needs_update = False
-                if current_values[2] != status:
-                    current_values[2] = status
-                    task_info["status"] = status
+        task_info = self.download_items.get(item_id)
+        if task_info is None:
+            return
+        try:
+            # task_info mirrors the row's values, so the change check needs no Tcl read
+            values = task_info.values
+            needs_update = False
+            if task_info.status != status:
+                task_info.status = values[2] = status
+                needs_update = True
+            if progress is not None:
+                safe_progress = int(progress)
+                safe_progress = 0 if safe_progress < 0 else 100 if safe_progress > 100 else safe_progress
+                if task_info.progress != safe_progress:
+                    task_info.progress = safe_progress
+                    values[3] = _PROGRESS_TEXT[safe_progress]
                     needs_update = True
-                if progress is not None:
-                    safe_progress = max(0, min(100, int(progress)))
-                    new_progress_str = f"{safe_progress}%"
-                    if current_values[3] != new_progress_str:
-                        current_values[3] = new_progress_str
-                        task_info["progress"] = safe_progress
-                        needs_update = True
-                if needs_update:
-                    self.tree.item(tree_id, values=tuple(current_values))
-            except tk.TclError as e:
-                print(f"TclError updating item {item_id}: {e}.")
-            except Exception as e:
-                print(f"Error updating GUI for {item_id}: {e}")
+            if needs_update:
+                self.tree.item(task_info.tree_id, values=values)
+        except tk.TclError:
+            pass  # Item removed from UI
+        except Exception as e:
+            print(f"Error updating GUI for {item_id}: {e}")
 
     def process_gui_queue(self):
         """Processes status messages AND finish signals from download threads."""
+        # Latest (status, progress) per item; only one Treeview update per item per tick
+        pending_updates = {}
+        # Take everything queued so far in one lock acquisition instead of a get() per message
+        with self.gui_queue.mutex:
+            batch = self.gui_queue.queue
+            self.gui_queue.queue = collections.deque()
+            self.gui_queue.unfinished_tasks = 0  # Nobody join()s this queue
+        items = self.download_items
+        update_status = self.update_item_status
         try:
-            while True:  # Process all available messages
-                update = self.gui_queue.get_nowait()
-                item_id = update.get("id")
-                status = update.get("status")
-                progress = update.get("progress")
-                if not item_id:
-                    continue
-
-                # --- Handle the special FINISHED signal ---
-                if status == "FINISHED":
-                    # Check if we were tracking this instance when it finished
-                    if item_id in self.downloader_instances:
-                        if self.active_download_count > 0:
-                            self.active_download_count -= 1
-                            print(
-                                f"Download finished/stopped ({self.download_items.get(item_id, {}).get('name', '?')}). Active: {self.active_download_count}/{self.max_concurrent_var.get()}")
-                            # Since a slot is free, check queue
-                            self._check_and_start_pending()
-                        else:
-                            print(
-                                "Warning: FINISHED signal received but active_count was already 0.")
-                        # Remove instance ref now? Maybe better than leaving dangling refs?
-                        # if item_id in self.downloader_instances: del self.downloader_instances[item_id]
-                    # else: Instance might have been removed already. Count adjusted manually?
+            for update in batch:  # Process all available messages
+                try:
+                    item_id, status, progress = update
+                    if not item_id:
+                        continue
 
-                # --- Handle regular status updates ---
-                else:
-                    self.update_item_status(item_id, status, progress)
+                    # --- Handle the special FINISHED signal ---
+                    if status == "FINISHED":
+                        # Show the item's final status before freeing its slot
+                        if item_id in pending_updates:
+                            update_status(
+                                item_id, *pending_updates.pop(item_id))
+                        # Check if we were tracking this instance when it finished
+                        task_info = items.get(item_id)
+                        if task_info is not None and task_info.downloader is not None and not task_info.finished:
+                            task_info.finished = True
+                            if self.active_download_count > 0:
+                                self.active_download_count -= 1
+                                log.debug("Download finished/stopped (%s). Active: %d/%d",
+                                          task_info.name, self.active_download_count, self._max_concurrent)
+                                # Since a slot is free, check queue
+                                self._check_and_start_pending()
+                            else:
+                                print(
+                                    "Warning: FINISHED signal received but active_count was already 0.")
+                        # else: Instance might have been removed already. Count adjusted manually?
+
+                    # --- Collect regular status updates (folded per item) ---
+                    else:
+                        if progress is None and item_id in pending_updates:
+                            # Keep the last known progress if this update only changes the status
+                            progress = pending_updates[item_id][1]
+                        pending_updates[item_id] = (status, progress)
+                except Exception as e:
+                    # One bad message must not drop the rest of the batch (e.g. a FINISHED)
+                    print(f"Error processing GUI queue message {update}: {e}")
+                    traceback.print_exc()
 
-        except queue.Empty:
-            pass  # No messages left
         except Exception as e:
             print(f"Error processing GUI queue: {e}")
             traceback.print_exc()
         finally:
-            self.root.after(100, self.process_gui_queue)  # Reschedule
+            for item_id, (status, progress) in pending_updates.items():
+                update_status(item_id, status, progress)
+            # ~20 Hz while anything is running; slow sanity tick once everything is idle
+            idle = not batch and self.active_download_count == 0
+            self._gui_poll_idle = idle
+            self._schedule_gui_poll(GUI_IDLE_POLL_MS if idle else GUI_POLL_MS)
+
+    def _schedule_gui_poll(self, delay_ms):
+        self._gui_poll_id = self.root.after(delay_ms, self.process_gui_queue)
+
+    def _wake_gui_queue(self):
+        """Switch back to fast polling when a download starts during an idle tick."""
+        if self._gui_poll_idle:
+            self._gui_poll_idle = False
+            self.root.after_cancel(self._gui_poll_id)
+            self._schedule_gui_poll(GUI_POLL_MS)
 
     def on_closing(self):
         """Handle window close event (WM_DELETE_WINDOW)."""
@@ -1623,12 +2230,15 @@ class DownloadManagerApp:
         if self.active_download_count > 0:
             if messagebox.askokcancel("Quit", f"{self.active_download_count} downloads active. Quit anyway?", parent=self.root):
                 print("Stopping active downloads on exit...")
-                for instance in self.downloader_instances.values():
-                    instance.stop_event.set()
-                # Wait a very brief moment allows threads to potentially acknowledge stop
-                # time.sleep(0.1) # Optional small delay
+                for task_info in self.download_items.values():
+                    if task_info.downloader is not None:
+                        task_info.downloader.stop_event.set()
+                self.download_executor.shutdown(wait=False, cancel_futures=True)
+                self.aux_executor.shutdown(wait=False, cancel_futures=True)
                 self.root.destroy()
         else:
+            self.download_executor.shutdown(wait=False, cancel_futures=True)
+            self.aux_executor.shutdown(wait=False, cancel_futures=True)
             self.root.destroy()
 
 
@@ -1645,6 +2255,14 @@ if __name__ == "__main__":
             pass  # Avoid errors during error reporting
     tk.Tk.report_callback_exception = show_error
 
+    if "--verbose" in sys.argv[1:]:
+        # Only this app's logger; the root logger stays quiet (urllib3 logs every request)
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.DEBUG)
+        log.propagate = False
+
     root = tk.Tk()
     app = DownloadManagerApp(root)
     root.mainloop()